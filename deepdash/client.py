@@ -0,0 +1,176 @@
+"""Thin Gymnasium vector client for a running ``deepdash.serve`` host.
+
+The client only needs numpy and gymnasium>=1.1 (the rest of deepdash also
+runs on 0.29): all simulation and rendering happens in the server process. Observations arrive through a shared-memory
+ring owned by the server, so no pixel data crosses the socket.
+
+Usage:
+    envs = RemoteVectorEnv(num_envs=16, render_mode="semantic")
+    obs, infos = envs.reset(seed=0)
+    obs, rewards, terminations, truncations, infos = envs.step(actions)
+"""
+import json
+import os
+import socket
+import struct
+import tempfile
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.vector.utils import batch_space
+
+try:
+    from gymnasium.vector import AutoresetMode
+except ImportError:  # gymnasium < 1.1; only RemoteVectorEnv needs it
+    AutoresetMode = None
+
+from deepdash.core.constants import OUTPUT_SIZE, DEFAULT_LEVEL_LENGTH
+
+
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), "deepdash.sock")
+
+# Every message is a 4-byte little-endian length followed by UTF-8 JSON
+HEADER = struct.Struct("<I")
+
+
+def encode_message(msg: dict[str, Any]) -> bytes:
+    payload = json.dumps(msg).encode("utf-8")
+    return HEADER.pack(len(payload)) + payload
+
+
+class RemoteVectorEnv(gym.vector.VectorEnv):
+    """Vector env whose sub-environments live in a ``deepdash.serve`` process.
+
+    Uses next-step autoreset, like Gymnasium's own vector envs: the step after
+    an episode ends resets that sub-environment and returns its first frame.
+
+    Args:
+        num_envs: Number of sub-environments to host on the server.
+        socket_path: Unix socket the server listens on.
+        render_mode: "rgb_array" or "semantic".
+        difficulty: Level difficulty passed to every sub-environment.
+        level_length: Level length in columns.
+        copy: If False, observations are read-only views into the shared
+            ring and stay valid only until the ring wraps around
+            (``ring_size - 1`` further reset/step calls).
+    """
+
+    metadata = {"autoreset_mode": AutoresetMode.NEXT_STEP} if AutoresetMode is not None else {}
+
+    def __init__(
+        self,
+        num_envs: int,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        render_mode: str = "rgb_array",
+        difficulty: float = 0.5,
+        level_length: int = DEFAULT_LEVEL_LENGTH,
+        copy: bool = True,
+    ):
+        if AutoresetMode is None:
+            raise ImportError(f"RemoteVectorEnv requires gymnasium>=1.1.0, found {gym.__version__}")
+        self.num_envs = num_envs
+        self.render_mode = render_mode
+        self.copy = copy
+
+        self.single_observation_space = gym.spaces.Box(
+            low=0, high=255, shape=(OUTPUT_SIZE, OUTPUT_SIZE, 3), dtype=np.uint8,
+        )
+        self.single_action_space = gym.spaces.Discrete(2)
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._shm: SharedMemory | None = None
+        try:
+            self._sock.connect(socket_path)
+            reply = self._request({
+                "op": "hello",
+                "num_envs": num_envs,
+                "render_mode": render_mode,
+                "difficulty": difficulty,
+                "level_length": level_length,
+            })
+            self._shm = SharedMemory(name=reply["shm_name"])
+        except BaseException:
+            self._sock.close()
+            raise
+        # The server owns (and unlinks) the segment; stop our resource
+        # tracker from destroying it when this process exits. Workaround
+        # until Python 3.13's SharedMemory(track=False) is the minimum.
+        if os.name == "posix":
+            # The tracker is keyed by the POSIX name, with its leading slash
+            resource_tracker.unregister("/" + self._shm.name, "shared_memory")
+        self._ring = np.ndarray(
+            (reply["ring_size"], num_envs, OUTPUT_SIZE, OUTPUT_SIZE, 3),
+            dtype=np.uint8, buffer=self._shm.buf,
+        )
+
+    def reset(
+        self,
+        *,
+        seed: int | list[int | None] | None = None,
+        options: dict | None = None,
+    ) -> tuple[np.ndarray, dict]:
+        if seed is None or isinstance(seed, int):
+            super().reset(seed=seed)
+            seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        else:
+            seeds = list(seed)
+            assert len(seeds) == self.num_envs
+            # VectorEnv.reset only takes an int seed for its own RNG
+            super().reset(seed=seeds[0])
+
+        reply = self._request({"op": "reset", "seeds": seeds, "options": options})
+        return self._get_obs(reply["slot"]), self._merge_infos(reply["infos"])
+
+    def step(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+        reply = self._request({"op": "step", "actions": actions.tolist()})
+        return (
+            self._get_obs(reply["slot"]),
+            np.asarray(reply["rewards"], dtype=np.float64),
+            np.asarray(reply["terminations"], dtype=np.bool_),
+            np.asarray(reply["truncations"], dtype=np.bool_),
+            self._merge_infos(reply["infos"]),
+        )
+
+    def close_extras(self, **kwargs):
+        if self._shm is not None:
+            self._ring = None
+            self._shm.close()
+            self._shm = None
+        self._sock.close()
+
+    def _get_obs(self, slot: int) -> np.ndarray:
+        obs = self._ring[slot]
+        if self.copy:
+            return obs.copy()
+        view = obs.view()
+        view.flags.writeable = False
+        return view
+
+    def _merge_infos(self, env_infos: list[dict]) -> dict:
+        infos: dict[str, Any] = {}
+        for i, info in enumerate(env_infos):
+            infos = self._add_info(infos, info, i)
+        return infos
+
+    def _request(self, msg: dict[str, Any]) -> dict[str, Any]:
+        self._sock.sendall(encode_message(msg))
+        (length,) = HEADER.unpack(self._recv_exactly(HEADER.size))
+        reply = json.loads(self._recv_exactly(length))
+        if "error" in reply:
+            raise RuntimeError(f"deepdash.serve: {reply['error']}")
+        return reply
+
+    def _recv_exactly(self, n: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = self._sock.recv(n - len(buf))
+            if not chunk:
+                raise ConnectionError("deepdash.serve closed the connection")
+            buf += chunk
+        return bytes(buf)
@@ -1,5 +1,10 @@
+import copy
+from collections.abc import Sequence
+
+import numpy as np
+
 from deepdash.core.constants import (
-    TileType, TILE_SIZE, PLAYER_SPEED, VIEWPORT_TILES_X,
+    TileType, TILE_SIZE, GRAVITY, PLAYER_SPEED, VIEWPORT_TILES_X,
     INTERNAL_WIDTH, INTERNAL_HEIGHT,
 )
 from deepdash.core.player import Player
@@ -7,8 +12,26 @@ from deepdash.core.level import Level
 
 
 class GameState:
-    def __init__(self, level: Level):
+    """Game simulation for one level.
+
+    Args:
+        level: The level to play.
+        dt: Fine ticks simulated per ``step`` call (the action applies to the
+            first one). Motion between contacts is advanced without collision
+            queries: a swept AABB over the step's whole trajectory collects
+            the tiles it can touch, and only the ticks where the hitbox
+            actually reaches one of them go through ``_resolve_collisions``.
+            Nothing can be tunneled through, and the result is identical to
+            calling ``step(action)`` then ``step(0)`` ``dt - 1`` times with
+            ``dt=1``; rewards are summed the same way. The only loss is
+            control resolution: jumps can start on every ``dt``-th tick.
+    """
+
+    def __init__(self, level: Level, dt: int = 1):
+        if dt < 1:
+            raise ValueError(f"dt must be >= 1, got {dt}")
         self.level = level
+        self.dt = dt
         # Spawn player on ground in the safe zone
         spawn_x = 3.0 * TILE_SIZE
         spawn_y = (level.grid.shape[0] - 1) * TILE_SIZE
@@ -20,43 +43,255 @@ class GameState:
         self.tick = 0
         self.done = False
         self.won = False
+        # support_row -> next non-flat column index (fast-forward, coarse dt)
+        self._next_blocked: dict[int, np.ndarray] = {}
 
     def step(self, action: int) -> tuple[float, bool]:
-        """Advance one tick. Returns (reward, done)."""
+        """Advance ``dt`` ticks. Returns (reward, done)."""
         if self.done:
             return 0.0, True
 
         # 1. Apply action
         self.player.apply_action(action)
 
-        # 2. Apply physics
-        self.player.apply_physics()
+        if self.dt == 1:
+            # 2. Apply physics
+            self.player.apply_physics()
 
-        # 3. Collision resolution
-        self._resolve_collisions()
+            # 3. Collision resolution
+            self._resolve_collisions()
+            ticks = 1
+        else:
+            # 2-3. Physics and collisions, stopping early if the episode ends
+            ticks = self._advance_swept(self.dt)
 
         # 4. Update camera
         self._update_camera()
 
+        # Reward for ticks survived before the last one
+        survived = float(ticks - 1)
+
         # 5. Death checks
         if not self.player.alive:
             self.done = True
-            return -100.0, True
+            self.tick += ticks - 1
+            return survived - 100.0, True
 
         # Fell off screen
         if self.player.y > INTERNAL_HEIGHT + TILE_SIZE:
             self.player.alive = False
             self.done = True
-            return -100.0, True
+            self.tick += ticks - 1
+            return survived - 100.0, True
 
         # 6. Win check: reached end of level
         if self.player.x >= self.level.width_pixels - TILE_SIZE * 2:
             self.done = True
             self.won = True
-            return 100.0, True
+            self.tick += ticks - 1
+            return survived + 100.0, True
+
+        self.tick += ticks
+        return survived + 1.0, False
+
+    def clone(self) -> "GameState":
+        """Independent copy of this state. The level is shared, not copied."""
+        state = copy.copy(self)
+        state.player = copy.copy(self.player)
+        return state
+
+    def fast_forward(self, actions: Sequence[int]) -> tuple[float, bool]:
+        """Apply a sequence of actions. Returns (total_reward, done).
+
+        Equivalent to calling ``step`` once per action, but runs of no-op
+        actions on flat ground are skipped in closed form via
+        ``advance_until_event``. The final state is identical.
+        """
+        total_reward = 0.0
+        i, n = 0, len(actions)
+        while i < n and not self.done:
+            if actions[i] != 0:
+                reward, _ = self.step(actions[i])
+                total_reward += reward
+                i += 1
+                continue
+
+            # Run of no-op actions: skip what we can, step through the rest
+            run_end = i
+            while run_end < n and actions[run_end] == 0:
+                run_end += 1
+            while i < run_end and not self.done:
+                skipped = self.advance_until_event(run_end - i)
+                total_reward += float(skipped * self.dt)
+                i += skipped
+                if i < run_end:
+                    reward, _ = self.step(0)
+                    total_reward += reward
+                    i += 1
+
+        return total_reward, self.done
+
+    def advance_until_event(self, max_steps: int | None = None) -> int:
+        """Skip no-op steps until something other than x can change.
+
+        While the player stands on flat ground with only empty tiles above,
+        a no-op step just moves it right by ``vx * dt`` and earns ``dt``
+        reward. This computes how many such steps remain before the hitbox
+        reaches a spike, wall, gap or the level end, and jumps there at once.
+
+        Returns the number of steps advanced (reward is ``dt`` per step).
+        Returns 0 when the player is not in that steady state; call ``step``
+        then.
+        """
+        steps = self._free_run_steps()
+        if max_steps is not None:
+            steps = min(steps, max_steps)
+        if steps <= 0:
+            return 0
+
+        self.player.x += steps * self.dt * self.player.vx
+        self.tick += steps * self.dt
+        self._update_camera()
+        return steps
+
+    def _free_run_steps(self) -> int:
+        """Number of upcoming no-op steps that only advance x."""
+        player = self.player
+        if self.done or not player.alive or not player.on_ground or player.vy != 0:
+            return 0
+        # x + n * vx only matches repeated addition exactly for integral values
+        if not (float(player.x).is_integer() and float(player.vx).is_integer()) or player.vx <= 0:
+            return 0
+
+        support_row = int((player.y + player.height) // TILE_SIZE)
+        if player.y != support_row * TILE_SIZE - player.height:
+            return 0
+        if not 0 < support_row < self.level.rows:
+            return 0
+
+        next_blocked = self._next_blocked_columns(support_row)
 
-        self.tick += 1
-        return 1.0, False
+        # First column at or after the hitbox that it may not overlap
+        col_start = int(player.x // TILE_SIZE)
+        limit = int(next_blocked[col_start]) * TILE_SIZE
+
+        x, vx = int(player.x), int(player.vx) * self.dt
+        # Largest n with x + n*vx + width < limit (hitbox stays in flat columns)
+        n_flat = -((x + player.width - limit) // vx) - 1
+        # Largest n with x + n*vx < win line (win check would end the episode)
+        win_x = self.level.width_pixels - TILE_SIZE * 2
+        n_win = -((x - win_x) // vx) - 1
+        return max(0, min(n_flat, n_win))
+
+    def _next_blocked_columns(self, support_row: int) -> np.ndarray:
+        next_blocked = self._next_blocked.get(support_row)
+        if next_blocked is None:
+            next_blocked = self._compute_next_blocked(support_row)
+            self._next_blocked[support_row] = next_blocked
+        return next_blocked
+
+    def _compute_next_blocked(self, support_row: int) -> np.ndarray:
+        """For each column, the first column at or after it that is not flat.
+
+        A flat column has solid ground at support_row and only empty tiles in
+        the rows the player's body spans. Columns past the level end count as
+        blocked (index ``cols``).
+        """
+        grid = self.level.grid
+        cols = self.level.cols
+        top_row = max(0, int((support_row * TILE_SIZE - self.player.height) // TILE_SIZE))
+        solid = np.isin(grid[support_row], (TileType.GROUND, TileType.PLATFORM))
+        clear = (grid[top_row:support_row] == TileType.EMPTY).all(axis=0)
+        flat = solid & clear
+
+        # Reverse running minimum of blocked column indices
+        idx = np.where(flat, cols, np.arange(cols))
+        return np.minimum.accumulate(idx[::-1])[::-1]
+
+    def _advance_swept(self, ticks: int) -> int:
+        """Simulate up to ``ticks`` ticks. Returns the number simulated.
+
+        Contact-free ticks are advanced in bulk; each tick where the hitbox
+        reaches a tile runs the regular physics + collision pass. Stops after
+        the first tick that ends the episode.
+        """
+        player = self.player
+        elapsed = 0
+        while elapsed < ticks:
+            elapsed += self._advance_free(ticks - elapsed)
+            if elapsed == ticks:
+                break
+            player.apply_physics()
+            self._resolve_collisions()
+            elapsed += 1
+            if self._episode_over():
+                break
+        return elapsed
+
+    def _advance_free(self, max_ticks: int) -> int:
+        """Advance through ticks with no tile contact and no episode end.
+
+        Returns the number of ticks advanced; the next tick (if any) needs
+        the full per-tick path.
+        """
+        player = self.player
+        win_x = self.level.width_pixels - TILE_SIZE * 2
+
+        if player.on_ground and player.vy == 0:
+            # Running on ground: free while the hitbox stays over flat columns
+            support_row = int((player.y + player.height) // TILE_SIZE)
+            next_blocked = self._next_blocked_columns(support_row)
+            limit = int(next_blocked[int(player.x // TILE_SIZE)]) * TILE_SIZE
+            x = player.x
+            free = 0
+            while free < max_ticks:
+                x_next = x + player.vx
+                if x_next + player.width >= limit or x_next >= win_x:
+                    break
+                x = x_next
+                free += 1
+            player.x = x
+            return free
+
+        # Airborne: trace the path exactly as apply_physics would
+        path = []
+        x, y, vy = player.x, player.y, player.vy
+        for _ in range(max_ticks):
+            vy += GRAVITY
+            x += player.vx
+            y += vy
+            path.append((x, y, vy))
+
+        # Swept AABB of the whole path gives the only tiles it can touch
+        w, h = player.width, player.height
+        ys = [p[1] for p in path]
+        tiles = self.level.get_tiles_in_rect(path[0][0], min(ys), path[-1][0] + w, max(ys) + h)
+
+        free = 0
+        for x, y, vy in path:
+            if x >= win_x or y > INTERNAL_HEIGHT + TILE_SIZE:
+                break
+            col_start, col_end = int(x // TILE_SIZE), int((x + w) // TILE_SIZE)
+            row_start, row_end = int(y // TILE_SIZE), int((y + h) // TILE_SIZE)
+            if any(
+                col_start <= col <= col_end and row_start <= row <= row_end
+                for col, row, _ in tiles
+            ):
+                break
+            free += 1
+
+        if free:
+            player.x, player.y, player.vy = path[free - 1]
+        return free
+
+    def _episode_over(self) -> bool:
+        """Whether the current tick would end the episode (see ``step``)."""
+        player = self.player
+        return (
+            not player.alive
+            or player.y > INTERNAL_HEIGHT + TILE_SIZE
+            or player.x >= self.level.width_pixels - TILE_SIZE * 2
+        )
 
     def _resolve_collisions(self):
         """Resolve collisions: vertical landing → spikes → wall death.
@@ -0,0 +1,275 @@
+"""Content-hash deduplication of recorded DeepDash observations.
+
+Flat-ground runs and safe zones produce many identical frames. This stage
+hashes frames in bulk, keeps a persistent on-disk index
+hash -> (count, first location), writes each distinct frame once, and
+emits a count-weighted shard set for VAE training.
+
+Input shards are .npy arrays of frames, shape (N, 64, 64, 3) uint8, i.e.
+stacked env observations. Output directory layout:
+    index.sqlite          hash index (resumable, inputs already added are skipped)
+    frames_00000.npy      distinct frames, (n, 64, 64, 3) uint8
+    weights_00000.npy     how often each of those frames was seen, (n,) int64
+
+Run with: python -m deepdash.dedup OUT_DIR shard.npy [shard.npy ...] [--shard-size 4096]
+"""
+import argparse
+import os
+import sqlite3
+from functools import lru_cache
+
+import numpy as np
+
+
+DEFAULT_SHARD_SIZE = 4096  # output frames per shard (~48 MB at 64x64x3)
+DEFAULT_CHUNK_SIZE = 2048  # input frames hashed per batch
+
+_MIX = np.uint64(0xBF58476D1CE4E5B9)
+
+
+@lru_cache(maxsize=None)
+def _hash_weights(n_words: int) -> np.ndarray:
+    """Fixed per-position odd multipliers, two independent 64-bit lanes."""
+    rng = np.random.default_rng(0xDEE9DA5)
+    return rng.integers(0, 2**64, size=(2, n_words), dtype=np.uint64) | np.uint64(1)
+
+
+def hash_frames(frames: np.ndarray) -> np.ndarray:
+    """128-bit content hash of each frame. Returns (n, 2) uint64.
+
+    Each 8-byte word is scrambled with a xorshift-multiply step, then the
+    words are combined with random per-position multipliers (mod 2**64) in
+    two independent lanes. Not cryptographic, but at 128 bits accidental
+    collisions are negligible even for billions of frames.
+    """
+    frames = np.ascontiguousarray(frames)
+    n = len(frames)
+    row_bytes = frames[0].nbytes if n else 0
+    if row_bytes % 8:
+        raise ValueError(f"frame size must be a multiple of 8 bytes, got {row_bytes}")
+
+    words = frames.reshape(n, -1).view(np.uint64)
+    mixed = words ^ (words >> np.uint64(31))
+    mixed *= _MIX
+    mixed ^= mixed >> np.uint64(29)
+
+    weights = _hash_weights(words.shape[1])
+    keys = np.empty((n, 2), dtype=np.uint64)
+    keys[:, 0] = (mixed * weights[0]).sum(axis=1, dtype=np.uint64)
+    keys[:, 1] = (mixed * weights[1]).sum(axis=1, dtype=np.uint64)
+    return keys
+
+
+class FrameDeduplicator:
+    """Persistent hash index that writes each distinct frame once.
+
+    The index lives in SQLite, so memory stays bounded by one input chunk
+    plus one output shard regardless of corpus size. The open output shard
+    is kept across inputs, so every shard except the last is full.
+
+    The index is committed whenever an output shard fills, together with how
+    far each input has been read, and on ``finalize``/``close``, which also
+    write the partly filled last shard. That shard is reloaded and extended
+    by later runs. If ingestion is interrupted, adding the same inputs again
+    resumes from the last commit; inputs already fully indexed are skipped.
+
+    Args:
+        out_dir: Directory for the index and output shards.
+        shard_size: Distinct frames per output shard (the last one may hold
+            fewer).
+    """
+
+    def __init__(self, out_dir: str, shard_size: int = DEFAULT_SHARD_SIZE):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.shard_size = shard_size
+        self.db = sqlite3.connect(os.path.join(out_dir, "index.sqlite"))
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS sources (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                indexed INTEGER NOT NULL DEFAULT 0,
+                done INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS frames (
+                h1 INTEGER NOT NULL,
+                h2 INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                src_id INTEGER NOT NULL,
+                src_index INTEGER NOT NULL,
+                out_shard INTEGER NOT NULL,
+                out_index INTEGER NOT NULL,
+                PRIMARY KEY (h1, h2)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS frames_out ON frames (out_shard, out_index);
+            CREATE TEMP TABLE chunk_keys (h1 INTEGER NOT NULL, h2 INTEGER NOT NULL);
+        """)
+        self._load_open_shard()
+
+    def add(self, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> tuple[int, int]:
+        """Index one input shard. Returns (frames read, new distinct frames).
+
+        Inputs already fully indexed are skipped and return (0, 0); a
+        partly indexed one continues where the last commit left off.
+        """
+        path = os.path.abspath(path)
+        row = self.db.execute("SELECT id, indexed, done FROM sources WHERE path = ?", (path,)).fetchone()
+        if row is not None and row[2]:
+            return 0, 0
+
+        frames = np.load(path, mmap_mode="r")
+        if frames.dtype != np.uint8 or frames.ndim < 2:
+            raise ValueError(f"{path}: expected uint8 frames of shape (N, ...), got {frames.dtype} {frames.shape}")
+
+        try:
+            if row is None:
+                src_id, resume_at = self.db.execute("INSERT INTO sources (path) VALUES (?)", (path,)).lastrowid, 0
+            else:
+                src_id, resume_at = row[0], row[1]
+
+            n_new = 0
+            for start in range(resume_at, len(frames), chunk_size):
+                chunk = np.asarray(frames[start:start + chunk_size])
+                keys = hash_frames(chunk).view(np.int64)  # signed: SQLite integers are int64
+                done = 0
+                while done < len(chunk):
+                    used, new = self._add_chunk(chunk[done:], keys[done:], src_id, start + done)
+                    done += used
+                    n_new += new
+                    if len(self._buffer) == self.shard_size:
+                        self._flush(src_id, start + done)
+            self.db.execute("UPDATE sources SET indexed = ?, done = 1 WHERE id = ?", (len(frames), src_id))
+        except BaseException:
+            # Back to the last commit, whose frames are all on disk
+            self.db.rollback()
+            self._load_open_shard()
+            raise
+        return len(frames) - resume_at, n_new
+
+    def finalize(self):
+        """Write weights_XXXXX.npy (per-frame counts) for every output shard."""
+        self._checkpoint()
+        rows = self.db.execute("SELECT out_shard, count FROM frames ORDER BY out_shard, out_index")
+        shard, counts = None, []
+        for out_shard, count in rows:
+            if out_shard != shard:
+                if shard is not None:
+                    self._save("weights", shard, np.asarray(counts, dtype=np.int64))
+                shard, counts = out_shard, []
+            counts.append(count)
+        if shard is not None:
+            self._save("weights", shard, np.asarray(counts, dtype=np.int64))
+
+    def stats(self) -> tuple[int, int]:
+        """(total frames seen, distinct frames) across everything indexed."""
+        total, distinct = self.db.execute("SELECT COALESCE(SUM(count), 0), COUNT(*) FROM frames").fetchone()
+        return total, distinct
+
+    def close(self):
+        self._checkpoint()
+        self.db.close()
+
+    def _add_chunk(self, chunk: np.ndarray, keys: np.ndarray, src_id: int, offset: int) -> tuple[int, int]:
+        """Index the longest prefix of `chunk` whose new frames fit in the open shard.
+
+        Returns (frames consumed, new distinct frames).
+        """
+        uniq, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        existing = self._lookup(uniq)
+        is_new = np.array([(h1, h2) not in existing for h1, h2 in uniq.tolist()], dtype=bool)
+
+        # Stop right before the first new frame that would overflow the shard
+        end = len(chunk)
+        new_first = np.sort(first[is_new])
+        room = self.shard_size - len(self._buffer)
+        if len(new_first) > room:
+            end = int(new_first[room])
+        counts = np.bincount(inverse[:end], minlength=len(uniq))
+
+        updates, inserts = [], []
+        for u in np.argsort(first):  # keep first-seen order in the output shards
+            if counts[u] == 0:
+                break  # sorted by first index, so the rest start past `end`
+            h1, h2 = uniq[u].tolist()
+            count = int(counts[u])
+            if is_new[u]:
+                i = int(first[u])
+                inserts.append((h1, h2, count, src_id, offset + i, self._next_shard, len(self._buffer)))
+                self._buffer.append(chunk[i].copy())
+            else:
+                updates.append((count, h1, h2))
+
+        self.db.executemany("UPDATE frames SET count = count + ? WHERE h1 = ? AND h2 = ?", updates)
+        self.db.executemany("INSERT INTO frames VALUES (?, ?, ?, ?, ?, ?, ?)", inserts)
+        return end, len(inserts)
+
+    def _lookup(self, keys: np.ndarray) -> set[tuple[int, int]]:
+        """Which of `keys` are already in the index."""
+        self.db.execute("DELETE FROM chunk_keys")
+        self.db.executemany("INSERT INTO chunk_keys VALUES (?, ?)", keys.tolist())
+        rows = self.db.execute(
+            "SELECT c.h1, c.h2 FROM chunk_keys c JOIN frames f ON f.h1 = c.h1 AND f.h2 = c.h2"
+        )
+        return set(rows)
+
+    def _flush(self, src_id: int, indexed: int):
+        """Write the full open shard and commit, recording input progress."""
+        self._save("frames", self._next_shard, np.stack(self._buffer))
+        self._next_shard += 1
+        self._buffer = []
+        self.db.execute("UPDATE sources SET indexed = ? WHERE id = ?", (indexed, src_id))
+        self.db.commit()
+
+    def _checkpoint(self):
+        """Write the partly filled open shard (kept open) and commit."""
+        if self._buffer:
+            self._save("frames", self._next_shard, np.stack(self._buffer))
+        self.db.commit()
+
+    def _load_open_shard(self):
+        """Restore the open shard's frames from disk, as of the last commit."""
+        self._buffer = []
+        (shard,) = self.db.execute("SELECT MAX(out_shard) FROM frames").fetchone()
+        if shard is None:
+            self._next_shard = 0
+            return
+        (n_frames,) = self.db.execute("SELECT COUNT(*) FROM frames WHERE out_shard = ?", (shard,)).fetchone()
+        if n_frames >= self.shard_size:
+            self._next_shard = shard + 1
+            return
+        # Later runs may have extended this file without committing; keep the committed prefix
+        self._next_shard = shard
+        frames = np.load(os.path.join(self.out_dir, f"frames_{shard:05d}.npy"))
+        self._buffer = list(frames[:n_frames])
+
+    def _save(self, kind: str, shard: int, array: np.ndarray):
+        # Write aside and swap in, so a crash never leaves a committed shard truncated
+        path = os.path.join(self.out_dir, f"{kind}_{shard:05d}.npy")
+        with open(path + ".tmp", "wb") as f:
+            np.save(f, array)
+        os.replace(path + ".tmp", path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicate recorded DeepDash frames")
+    parser.add_argument("out_dir", type=str)
+    parser.add_argument("shards", type=str, nargs="+", help="input .npy frame arrays")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    dedup = FrameDeduplicator(args.out_dir, shard_size=args.shard_size)
+    try:
+        for path in args.shards:
+            seen, new = dedup.add(path, chunk_size=args.chunk_size)
+            print(f"{path}: {seen} frames, {new} new")
+        dedup.finalize()
+        total, distinct = dedup.stats()
+        print(f"Index: {total} frames, {distinct} distinct")
+    finally:
+        dedup.close()
+
+
+if __name__ == "__main__":
+    main()
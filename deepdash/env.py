@@ -29,6 +29,7 @@ class DeepDashEnv(gym.Env):
         render_mode: str | None = "rgb_array",
         difficulty: float = 0.5,
         level_length: int = DEFAULT_LEVEL_LENGTH,
+        dt: int = 1,
     ):
         super().__init__()
 
@@ -36,6 +37,7 @@ class DeepDashEnv(gym.Env):
         self.render_mode = render_mode
         self.difficulty = difficulty
         self.level_length = level_length
+        self.dt = dt  # physics ticks per env step, see GameState
 
         self.observation_space = gym.spaces.Box(
             low=0, high=255, shape=(OUTPUT_SIZE, OUTPUT_SIZE, 3), dtype=np.uint8,
@@ -84,7 +86,7 @@ class DeepDashEnv(gym.Env):
             length=self.level_length,
             difficulty=self.difficulty,
         )
-        self._game_state = GameState(level)
+        self._game_state = GameState(level, dt=self.dt)
 
         obs = self._get_obs()
         info = self._get_info()
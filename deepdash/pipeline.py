@@ -0,0 +1,181 @@
+"""Double-buffered stepping that overlaps simulation with policy inference.
+
+The environments are split into two halves, A and B, each with its own
+observation buffer. A single worker thread simulates and renders one half
+while the caller runs inference on the other, so actor throughput tends to
+max(sim, inference) instead of their sum.
+
+Usage:
+    pipe = PipelinedEnv(num_envs=16, render_mode="semantic")
+    obs, infos = pipe.reset(seed=0)                 # half A
+    while True:
+        pipe.step_async(policy(obs))                # simulate this half...
+        obs, rewards, terminations, truncations, infos = pipe.step_wait()
+        # ...while the policy runs on the other one (pipe.current_half)
+
+Ordering is deterministic: halves are handed out strictly alternating,
+A, B, A, B, ..., starting with A after every reset, and the worker runs
+submitted halves in submission order.
+"""
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+import gymnasium as gym
+import numpy as np
+
+from deepdash.core.constants import OUTPUT_SIZE
+from deepdash.env import DeepDashEnv
+
+
+StepResult = tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, list[dict[str, Any]]]
+
+
+class _Half:
+    """One half of the environments plus the buffers it writes into."""
+
+    def __init__(self, envs: list[DeepDashEnv]):
+        self.envs = envs
+        n = len(envs)
+        self.obs = np.zeros((n, OUTPUT_SIZE, OUTPUT_SIZE, 3), dtype=np.uint8)
+        self.rewards = np.zeros(n, dtype=np.float64)
+        self.terminations = np.zeros(n, dtype=np.bool_)
+        self.truncations = np.zeros(n, dtype=np.bool_)
+        self.infos: list[dict[str, Any]] = [{} for _ in range(n)]
+        self.needs_reset = np.zeros(n, dtype=np.bool_)
+
+    def reset(self, seeds: list[int | None], options: dict | None) -> StepResult:
+        for i, (env, seed) in enumerate(zip(self.envs, seeds)):
+            self.obs[i], self.infos[i] = env.reset(seed=seed, options=options)
+        self.rewards[:] = 0.0
+        self.terminations[:] = False
+        self.truncations[:] = False
+        self.needs_reset[:] = False
+        return self.result()
+
+    def step(self, actions: np.ndarray) -> StepResult:
+        for i, env in enumerate(self.envs):
+            if self.needs_reset[i]:
+                # Next-step autoreset: this step only starts a new episode
+                self.obs[i], self.infos[i] = env.reset()
+                self.rewards[i] = 0.0
+                self.terminations[i] = False
+                self.truncations[i] = False
+            else:
+                obs, reward, terminated, truncated, info = env.step(int(actions[i]))
+                self.obs[i] = obs
+                self.rewards[i] = reward
+                self.terminations[i] = terminated
+                self.truncations[i] = truncated
+                self.infos[i] = info
+        self.needs_reset[:] = self.terminations | self.truncations
+        return self.result()
+
+    def result(self) -> StepResult:
+        return self.obs, self.rewards, self.terminations, self.truncations, list(self.infos)
+
+
+class PipelinedEnv:
+    """Two half-batches of DeepDashEnv stepped on a background thread.
+
+    Arrays returned by ``reset``/``step_wait`` are the half's own buffers,
+    not copies. They stay valid until that half is submitted again with
+    ``step_async``, which is exactly when the caller is done with them.
+
+    Args:
+        num_envs: Total number of environments (even, split in two halves).
+        **env_kwargs: Passed to every ``DeepDashEnv`` (render_mode must not
+            be "human").
+    """
+
+    def __init__(self, num_envs: int, **env_kwargs):
+        if num_envs < 2 or num_envs % 2:
+            raise ValueError(f"num_envs must be even and >= 2, got {num_envs}")
+        if env_kwargs.get("render_mode") == "human":
+            raise ValueError("render_mode='human' cannot be stepped off the main thread")
+
+        self.num_envs = num_envs
+        self.half_size = num_envs // 2
+        envs = [DeepDashEnv(**env_kwargs) for _ in range(num_envs)]
+        self._halves = (_Half(envs[:self.half_size]), _Half(envs[self.half_size:]))
+
+        self.single_observation_space = envs[0].observation_space
+        self.single_action_space = envs[0].action_space
+        self.observation_space = gym.vector.utils.batch_space(self.single_observation_space, self.half_size)
+        self.action_space = gym.vector.utils.batch_space(self.single_action_space, self.half_size)
+
+        # One worker: pygame rendering stays on a single thread, halves run in order
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="deepdash-sim")
+        self._pending: deque[tuple[int, Future]] = deque()
+        self._current: int | None = None  # half whose buffers the caller holds
+        self._submitted = False
+
+    @property
+    def current_half(self) -> int:
+        """Half (0 = A, 1 = B) of the observations last handed out."""
+        if self._current is None:
+            raise RuntimeError("call reset() first")
+        return self._current
+
+    def env_indices(self, half: int) -> range:
+        """Indices of the environments that belong to `half`."""
+        return range(half * self.half_size, (half + 1) * self.half_size)
+
+    def reset(
+        self,
+        seed: int | list[int | None] | None = None,
+        options: dict | None = None,
+    ) -> tuple[np.ndarray, list[dict[str, Any]]]:
+        """Reset all environments. Returns half A's (obs, infos)."""
+        self._drain()
+        if seed is None or isinstance(seed, int):
+            seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        else:
+            seeds = list(seed)
+            if len(seeds) != self.num_envs:
+                raise ValueError(f"expected {self.num_envs} seeds, got {len(seeds)}")
+
+        half_seeds = (seeds[:self.half_size], seeds[self.half_size:])
+        result = self._worker.submit(self._halves[0].reset, half_seeds[0], options).result()
+        # B resets in the background while the caller handles A
+        self._pending.append((1, self._worker.submit(self._halves[1].reset, half_seeds[1], options)))
+        self._current = 0
+        self._submitted = False
+        obs, _, _, _, infos = result
+        return obs, infos
+
+    def step_async(self, actions: np.ndarray):
+        """Submit actions for the current half; its simulation starts now."""
+        half = self.current_half
+        if self._submitted:
+            raise RuntimeError("step_async() called twice without step_wait()")
+        actions = np.asarray(actions).reshape(self.half_size)
+        self._pending.append((half, self._worker.submit(self._halves[half].step, actions)))
+        self._submitted = True
+
+    def step_wait(self) -> StepResult:
+        """Wait for the other half and hand out its buffers.
+
+        Returns (obs, rewards, terminations, truncations, infos) for the
+        half now reported by ``current_half``.
+        """
+        if not self._submitted:
+            raise RuntimeError("step_wait() called without step_async()")
+        half, future = self._pending.popleft()
+        result = future.result()
+        self._current = half
+        self._submitted = False
+        return result
+
+    def close(self):
+        self._drain()
+        self._worker.shutdown(wait=True)
+        for half in self._halves:
+            for env in half.envs:
+                env.close()
+
+    def _drain(self):
+        """Finish in-flight work so no half is being written to."""
+        while self._pending:
+            _, future = self._pending.popleft()
+            future.result()
@@ -1,10 +1,21 @@
-"""Human-playable mode for DeepDash.
+"""Human-playable mode and replay viewer for DeepDash.
 
-Run with: python -m deepdash.play [--difficulty 0.5] [--seed 42] [--length 200]
+Run with: python -m deepdash.play [--difficulty 0.5] [--seed 42] [--length 200] [--record ep.npz]
+Replay:   python -m deepdash.play --replay ep.npz [--keyframe-interval 256]
+
+Episode files are .npz archives with `seed`, `difficulty`, `length`,
+`actions` (one int per step) and `dt` (ticks per step; 1 if absent), as
+written by `save_episode`.
+
+Replay controls: SPACE pause, LEFT/RIGHT step one tick (hold SHIFT for a
+keyframe interval), UP/DOWN double/halve speed, HOME/END jump to start/end,
+click or drag the timeline to seek.
 """
 import argparse
 import sys
+from functools import lru_cache
 
+import numpy as np
 import pygame
 
 from deepdash.core.constants import INTERNAL_WIDTH, INTERNAL_HEIGHT, TILE_SIZE, TileType
@@ -13,16 +24,24 @@ from deepdash.core.constants import (
 )
 from deepdash.core.generator import generate_level
 from deepdash.core.game_state import GameState
+from deepdash.core.level import Level
 
 
 DISPLAY_SCALE = 3  # 256x192 * 3 = 768x576
 FPS = 30
+KEYFRAME_INTERVAL = 256  # steps between replay snapshots
+TIMELINE_HEIGHT = 4  # internal pixels
+
 
+@lru_cache(maxsize=None)
+def _draw_resources() -> tuple[pygame.Surface, pygame.font.Font]:
+    """Internal surface and HUD font, created once (needs pygame.init)."""
+    return pygame.Surface((INTERNAL_WIDTH, INTERNAL_HEIGHT)), pygame.font.SysFont(None, 16)
 
-def draw_game(screen: pygame.Surface, game_state: GameState):
+
+def draw_game(screen: pygame.Surface, game_state: GameState, hud: str | None = None):
     """Draw the game at full internal resolution onto the screen."""
-    # Create internal surface
-    internal = pygame.Surface((INTERNAL_WIDTH, INTERNAL_HEIGHT))
+    internal, font = _draw_resources()
     internal.fill(COLOR_SKY)
 
     cam_x = game_state.camera_x
@@ -59,13 +78,154 @@ def draw_game(screen: pygame.Surface, game_state: GameState):
     pygame.draw.rect(internal, COLOR_PLAYER, (px, py, player.width, player.height))
 
     # Draw HUD
-    font = pygame.font.SysFont(None, 16)
-    tick_text = font.render(f"Tick: {game_state.tick}", True, (255, 255, 255))
-    internal.blit(tick_text, (5, 5))
+    if hud is None:
+        hud = f"Tick: {game_state.tick}"
+    hud_text = font.render(hud, True, (255, 255, 255))
+    internal.blit(hud_text, (5, 5))
+
+    # Scale up straight into the display surface
+    pygame.transform.scale(internal, screen.get_size(), screen)
+
+
+def save_episode(path: str, seed: int, difficulty: float, length: int, actions: list[int], dt: int = 1):
+    """Write an episode (level parameters + per-step actions) for replay."""
+    np.savez_compressed(
+        path,
+        seed=np.int64(seed),
+        difficulty=np.float64(difficulty),
+        length=np.int64(length),
+        actions=np.asarray(actions, dtype=np.int8),
+        dt=np.int64(dt),
+    )
+
+
+def load_episode(path: str) -> tuple[Level, np.ndarray, int]:
+    """Read an episode written by `save_episode`. Returns (level, actions, dt)."""
+    with np.load(path) as data:
+        level = generate_level(
+            seed=int(data["seed"]),
+            length=int(data["length"]),
+            difficulty=float(data["difficulty"]),
+        )
+        # Episodes recorded before dt was stored are all dt=1
+        dt = int(data["dt"]) if "dt" in data else 1
+        return level, data["actions"].astype(np.int64), dt
+
 
-    # Scale up to display
-    scaled = pygame.transform.scale(internal, screen.get_size())
-    screen.blit(scaled, (0, 0))
+class Replay:
+    """Recorded episode with keyframe snapshots for random access.
+
+    Keyframes are taken every `keyframe_interval` steps, so reaching any step
+    re-simulates at most that many actions (fewer when moving forward from
+    the current position). `dt` must match the one the episode was recorded
+    with.
+    """
+
+    def __init__(
+        self,
+        level: Level,
+        actions: np.ndarray,
+        keyframe_interval: int = KEYFRAME_INTERVAL,
+        dt: int = 1,
+    ):
+        if keyframe_interval < 1:
+            raise ValueError(f"keyframe_interval must be >= 1, got {keyframe_interval}")
+        self.actions = actions
+        self.keyframe_interval = keyframe_interval
+        self.keyframes: list[GameState] = []
+
+        state = GameState(level, dt=dt)
+        for start in range(0, len(actions) + 1, keyframe_interval):
+            self.keyframes.append(state.clone())
+            state.fast_forward(actions[start:start + keyframe_interval])
+
+        self.index = 0
+        self.state = self.keyframes[0].clone()
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def seek(self, index: int) -> GameState:
+        """Move to the state after `index` actions and return it."""
+        index = min(max(index, 0), len(self.actions))
+        if not self.index <= index < self.index + self.keyframe_interval:
+            k = index // self.keyframe_interval
+            self.state = self.keyframes[k].clone()
+            self.index = k * self.keyframe_interval
+        self.state.fast_forward(self.actions[self.index:index])
+        self.index = index
+        return self.state
+
+
+def run_replay(screen: pygame.Surface, clock: pygame.time.Clock, path: str, keyframe_interval: int):
+    level, actions, dt = load_episode(path)
+    replay = Replay(level, actions, keyframe_interval, dt=dt)
+    total = len(replay)
+    print(f"Loaded {total} steps (dt={dt}), {len(replay.keyframes)} keyframes.")
+
+    position = 0.0  # fractional tick, advanced by `speed` ticks per frame
+    speed = 1.0
+    paused = False
+    scrubbing = False
+    scale_y = screen.get_height() / INTERNAL_HEIGHT
+    timeline_top = screen.get_height() - TIMELINE_HEIGHT * scale_y
+
+    def tick_at(mouse_x: int) -> int:
+        return int(mouse_x / screen.get_width() * total)
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                big = event.mod & pygame.KMOD_SHIFT
+                step = keyframe_interval if big else 1
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_RIGHT:
+                    position, paused = float(int(position) + step), True
+                elif event.key == pygame.K_LEFT:
+                    position, paused = float(int(position) - step), True
+                elif event.key == pygame.K_UP:
+                    speed *= 2.0
+                elif event.key == pygame.K_DOWN:
+                    speed /= 2.0
+                elif event.key == pygame.K_HOME:
+                    position = 0.0
+                elif event.key == pygame.K_END:
+                    position = float(total)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                if event.pos[1] >= timeline_top:
+                    scrubbing = True
+                    position = float(tick_at(event.pos[0]))
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                scrubbing = False
+            elif event.type == pygame.MOUSEMOTION and scrubbing:
+                position = float(tick_at(event.pos[0]))
+
+        if not paused and not scrubbing:
+            position += speed
+        position = min(max(position, 0.0), float(total))
+        if position == float(total) and not scrubbing:
+            paused = True
+
+        # Only the displayed tick is drawn; skipped ticks are just simulated
+        state = replay.seek(int(position))
+        status = "paused" if paused else f"x{speed:g}"
+        draw_game(screen, state, f"Tick: {replay.index}/{total}  {status}")
+
+        # Timeline bar with playhead
+        bar_rect = pygame.Rect(0, timeline_top, screen.get_width(), screen.get_height() - timeline_top)
+        pygame.draw.rect(screen, (40, 40, 40), bar_rect)
+        if total:
+            head = bar_rect.width * replay.index // total
+            pygame.draw.rect(screen, (255, 255, 255), (0, bar_rect.top, head, bar_rect.height))
+
+        pygame.display.flip()
+        clock.tick(FPS)
 
 
 def main():
@@ -73,15 +233,35 @@ def main():
     parser.add_argument("--difficulty", type=float, default=0.5)
     parser.add_argument("--seed", type=int, default=None)
     parser.add_argument("--length", type=int, default=200)
+    parser.add_argument("--record", type=str, default=None, help="save each finished episode here (.npz)")
+    parser.add_argument("--replay", type=str, default=None, help="episode file to replay (.npz)")
+    parser.add_argument("--keyframe-interval", type=int, default=KEYFRAME_INTERVAL)
     args = parser.parse_args()
+    if args.keyframe_interval < 1:
+        parser.error(f"--keyframe-interval must be >= 1, got {args.keyframe_interval}")
 
     pygame.init()
     screen = pygame.display.set_mode((INTERNAL_WIDTH * DISPLAY_SCALE, INTERNAL_HEIGHT * DISPLAY_SCALE))
-    pygame.display.set_caption("DeepDash - SPACE/UP to jump")
     clock = pygame.time.Clock()
 
+    if args.replay is not None:
+        pygame.display.set_caption("DeepDash - replay")
+        run_replay(screen, clock, args.replay, args.keyframe_interval)
+        pygame.quit()
+        sys.exit()
+
+    pygame.display.set_caption("DeepDash - SPACE/UP to jump")
+    rng = np.random.default_rng()
+    level_seed = args.seed
+    actions: list[int] = []
+
     def new_game():
-        level = generate_level(seed=args.seed, length=args.length, difficulty=args.difficulty)
+        nonlocal level_seed
+        # Recorded episodes need a concrete seed to regenerate the level
+        if args.seed is None and args.record is not None:
+            level_seed = int(rng.integers(0, 2**31))
+        actions.clear()
+        level = generate_level(seed=level_seed, length=args.length, difficulty=args.difficulty)
         return GameState(level)
 
     game_state = new_game()
@@ -106,7 +286,11 @@ def main():
 
         if not game_state.done:
             reward, done = game_state.step(action)
+            actions.append(action)
             if done:
+                if args.record is not None:
+                    save_episode(args.record, level_seed, args.difficulty, args.length, actions)
+                    print(f"Episode saved to {args.record}.")
                 if game_state.won:
                     print("YOU WIN! Press R to restart.")
                 else:
@@ -0,0 +1,294 @@
+"""Local batched environment server for DeepDash.
+
+Hosts DeepDash environments for many local clients. Clients connect over a
+Unix domain socket (see ``deepdash.client.RemoteVectorEnv``) and receive
+observations through a per-client shared-memory ring. Reset/step requests
+that arrive while the engine is busy are coalesced and simulated together
+as one batch.
+
+Run with: python -m deepdash.serve [--socket /tmp/deepdash.sock] [--ring-size 4] [--batch-window-ms 0]
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+import numpy as np
+
+from deepdash.client import DEFAULT_SOCKET_PATH, HEADER, encode_message
+from deepdash.core.constants import OUTPUT_SIZE, DEFAULT_LEVEL_LENGTH
+from deepdash.env import DeepDashEnv
+
+
+class _Session:
+    """Environments and observation ring belonging to one client."""
+
+    def __init__(
+        self,
+        num_envs: int,
+        ring_size: int,
+        render_mode: str = "rgb_array",
+        difficulty: float = 0.5,
+        level_length: int = DEFAULT_LEVEL_LENGTH,
+    ):
+        if num_envs < 1:
+            raise ValueError(f"num_envs must be >= 1, got {num_envs}")
+        if render_mode not in ("rgb_array", "semantic"):
+            raise ValueError(f"unsupported render_mode for serving: {render_mode!r}")
+
+        self.envs = [
+            DeepDashEnv(render_mode=render_mode, difficulty=difficulty, level_length=level_length)
+            for _ in range(num_envs)
+        ]
+        shape = (ring_size, num_envs, OUTPUT_SIZE, OUTPUT_SIZE, 3)
+        self.shm = SharedMemory(create=True, size=int(np.prod(shape)))
+        self.ring = np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf)
+        self.ring_size = ring_size
+        self._cursor = 0
+        self._needs_reset = np.zeros(num_envs, dtype=bool)
+
+    def _next_slot(self) -> int:
+        slot = self._cursor
+        self._cursor = (self._cursor + 1) % self.ring_size
+        return slot
+
+    def reset(self, seeds: list[int | None], options: dict | None) -> dict[str, Any]:
+        if len(seeds) != len(self.envs):
+            raise ValueError(f"expected {len(self.envs)} seeds, got {len(seeds)}")
+        slot = self._next_slot()
+        infos = []
+        for i, (env, seed) in enumerate(zip(self.envs, seeds)):
+            obs, info = env.reset(seed=seed, options=options)
+            self.ring[slot, i] = obs
+            infos.append(info)
+        self._needs_reset[:] = False
+        return {"slot": slot, "infos": infos}
+
+    def step(self, actions: list[int]) -> dict[str, Any]:
+        if len(actions) != len(self.envs):
+            raise ValueError(f"expected {len(self.envs)} actions, got {len(actions)}")
+        slot = self._next_slot()
+        rewards, terminations, truncations, infos = [], [], [], []
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            if self._needs_reset[i]:
+                # Next-step autoreset: this step only starts a new episode
+                obs, info = env.reset()
+                reward, terminated, truncated = 0.0, False, False
+            else:
+                obs, reward, terminated, truncated, info = env.step(int(action))
+            self.ring[slot, i] = obs
+            self._needs_reset[i] = terminated or truncated
+            rewards.append(reward)
+            terminations.append(terminated)
+            truncations.append(truncated)
+            infos.append(info)
+        return {
+            "slot": slot,
+            "rewards": rewards,
+            "terminations": terminations,
+            "truncations": truncations,
+            "infos": infos,
+        }
+
+    def handle(self, msg: dict[str, Any]) -> dict[str, Any]:
+        op = msg.get("op")
+        if op == "reset":
+            return self.reset(msg["seeds"], msg.get("options"))
+        if op == "step":
+            return self.step(msg["actions"])
+        raise ValueError(f"unknown op: {op!r}")
+
+    def close(self):
+        if self.shm is None:
+            return
+        for env in self.envs:
+            env.close()
+        self.ring = None
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+
+class EnvServer:
+    """asyncio Unix-socket server that batches requests across clients.
+
+    Each connection handler only parses messages and queues them. A single
+    batch loop drains everything queued so far and runs it on one engine
+    thread, so steps from different clients share one simulation batch and
+    pygame is only ever touched from that thread.
+
+    Args:
+        socket_path: Path of the Unix domain socket to listen on.
+        ring_size: Observation slots per client ring.
+        batch_window: Seconds to wait after the first queued request for
+            others to join the batch (0 = batch whatever is already queued).
+    """
+
+    def __init__(
+        self,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        ring_size: int = 4,
+        batch_window: float = 0.0,
+    ):
+        if ring_size < 2:
+            raise ValueError(f"ring_size must be >= 2, got {ring_size}")
+        self.socket_path = socket_path
+        self.ring_size = ring_size
+        self.batch_window = batch_window
+        self._engine = ThreadPoolExecutor(max_workers=1, thread_name_prefix="deepdash-engine")
+        self._pending: list[tuple[_Session, dict[str, Any], asyncio.Future]] = []
+        self._wakeup: asyncio.Event | None = None
+        self._clients: set[asyncio.Task] = set()
+        self._sessions: set[_Session] = set()
+
+    async def serve_forever(self):
+        """Serve until SIGINT or SIGTERM, then release the socket and all shared memory."""
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        stop = asyncio.Event()
+        # Register before any session runs pygame.init(): SDL only installs
+        # its own SIGINT/SIGTERM handlers when the default one is in place.
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+        batch_task = asyncio.create_task(self._batch_loop())
+        print(f"deepdash.serve listening on {self.socket_path}")
+        try:
+            await stop.wait()
+        finally:
+            server.close()
+            batch_task.cancel()
+            for task in self._clients:
+                task.cancel()
+            # Client handlers close their own sessions on the engine thread
+            await asyncio.gather(batch_task, *self._clients, return_exceptions=True)
+            self._engine.shutdown(wait=True)
+            for session in self._sessions:
+                session.close()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(sig)
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    async def _submit(self, session: _Session, msg: dict[str, Any]) -> dict[str, Any]:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((session, msg, future))
+        self._wakeup.set()
+        return await future
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            if self.batch_window > 0:
+                await asyncio.sleep(self.batch_window)
+            batch, self._pending = self._pending, []
+            self._wakeup.clear()
+            replies = await loop.run_in_executor(self._engine, _run_batch, batch)
+            for (_, _, future), reply in zip(batch, replies):
+                if not future.done():
+                    future.set_result(reply)
+
+    def _open_session(self, msg: dict[str, Any]) -> _Session:
+        # Registered on the engine thread, so shutdown still finds sessions
+        # whose handler was cancelled while they were being created.
+        session = _open_session(msg, self.ring_size)
+        self._sessions.add(session)
+        return session
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        session: _Session | None = None
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        self._clients.add(task)
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+                (length,) = HEADER.unpack(header)
+                msg = json.loads(await reader.readexactly(length))
+
+                if msg.get("op") == "hello":
+                    if session is not None:
+                        reply = {"error": "session already initialised"}
+                    else:
+                        try:
+                            session = await loop.run_in_executor(self._engine, self._open_session, msg)
+                            reply = {"shm_name": session.shm.name, "ring_size": session.ring_size}
+                        except Exception as e:
+                            reply = {"error": f"{type(e).__name__}: {e}"}
+                elif session is None:
+                    reply = {"error": "expected 'hello' before other requests"}
+                else:
+                    reply = await self._submit(session, msg)
+
+                writer.write(encode_message(reply))
+                await writer.drain()
+        except asyncio.CancelledError:
+            pass  # server shutting down
+        finally:
+            self._clients.discard(task)
+            if session is not None:
+                await loop.run_in_executor(self._engine, session.close)
+                self._sessions.discard(session)
+            writer.close()
+
+
+def _open_session(msg: dict[str, Any], ring_size: int) -> _Session:
+    return _Session(
+        num_envs=int(msg["num_envs"]),
+        ring_size=ring_size,
+        render_mode=msg.get("render_mode", "rgb_array"),
+        difficulty=float(msg.get("difficulty", 0.5)),
+        level_length=int(msg.get("level_length", DEFAULT_LEVEL_LENGTH)),
+    )
+
+
+def _run_batch(batch: list[tuple[_Session, dict[str, Any], asyncio.Future]]) -> list[dict[str, Any]]:
+    """Run every queued request on the engine thread, in arrival order."""
+    replies = []
+    for session, msg, _ in batch:
+        try:
+            replies.append(_to_json(session.handle(msg)))
+        except Exception as e:
+            replies.append({"error": f"{type(e).__name__}: {e}"})
+    return replies
+
+
+def _to_json(value: Any) -> Any:
+    """Convert numpy scalars in env replies to plain Python types."""
+    if isinstance(value, dict):
+        return {k: _to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve DeepDash environments over a Unix socket")
+    parser.add_argument("--socket", type=str, default=DEFAULT_SOCKET_PATH)
+    parser.add_argument("--ring-size", type=int, default=4)
+    parser.add_argument("--batch-window-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = EnvServer(
+        socket_path=args.socket,
+        ring_size=args.ring_size,
+        batch_window=args.batch_window_ms / 1000.0,
+    )
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == "__main__":
+    main()